@@ -1,3 +1,12 @@
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+
 def count_zero_hits_during_rotation(p, direction, dist, mod=100):
     dist = int(dist)
     p %= mod
@@ -39,4 +48,421 @@ def password_method_0x434C49434B(filename):
     return hits
 
 
-print(password_method_0x434C49434B("day1input.txt"))
+# ---- batch engine ----
+# The log is parsed straight into arrays of signed distances (R > 0, L < 0)
+# and the dial is simulated with prefix sums instead of line by line.
+
+def strip_spaces(buf, starts, ends):
+    """Move starts/ends in place past whitespace at either end of each line."""
+    for index, shift, at in ((starts, 1, 0), (ends, -1, -1)):
+        while True:
+            inside = np.flatnonzero(starts < ends)
+            b = buf[index[inside] + at]
+            space = inside[(b == 32) | ((b >= 9) & (b <= 13))]
+            if space.size == 0:
+                break
+            index[space] += shift
+
+
+def parse_rotations(data):
+    """
+    Parse a bytes buffer of complete rotation lines ("L49\nR48\n...") into
+    an int64 array of signed distances. Like the line-by-line reader,
+    surrounding whitespace is ignored and blank lines are skipped.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    if buf.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    if buf[-1] != 10:
+        buf = np.append(buf, np.uint8(10))
+
+    ends = np.flatnonzero(buf == 10)
+    if buf.size < 2 ** 31:
+        ends = ends.astype(np.int32)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    # strip each line, which also takes care of the "\r" of CRLF files; the
+    # usual file has no byte <= " " but the newlines and can skip this
+    spaced = np.count_nonzero(buf <= 32) > ends.size
+    if spaced:
+        strip_spaces(buf, starts, ends)
+
+    first = buf[starts]
+    keep = (first == ord("R")) | (first == ord("L"))
+    if not np.all(keep | (starts == ends)):
+        bad = int(starts[np.flatnonzero(~keep & (starts != ends))[0]])
+        line = bytes(buf[bad:bad + 20]).splitlines()[0]
+        raise ValueError(f"Bad rotation line: {line!r}")
+
+    left = first[keep] == ord("L")
+    lo = starts[keep] + 1
+    hi = ends[keep]
+    if spaced:
+        # int() also allows spaces between the letter and the number
+        strip_spaces(buf, lo, hi)
+    width = hi - lo
+    if width.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    if width.min() < 1 or width.max() > 18:
+        raise ValueError("Rotation distance must have 1 to 18 digits")
+    if np.count_nonzero(buf - np.uint8(48) < 10) != width.sum():
+        raise ValueError("Rotation distance is not a number")
+
+    # lines are short, so build the numbers one digit column at a time;
+    # hi is the line end, which is never a digit
+    wmax = int(width.max())
+    dist = np.zeros(lo.size, dtype=np.int32 if wmax <= 9 else np.int64)
+    for k in range(wmax):
+        digit = buf[np.minimum(lo + k, hi)] - np.uint8(48)
+        dist = np.where(digit < 10, dist * 10 + digit, dist)
+    dist = dist.astype(np.int64, copy=False)
+
+    return np.where(left, -dist, dist)
+
+
+def iter_rotation_blocks(filename, block_size=1 << 20, start=0, stop=None):
+    """
+    Yield the signed distances of a rotation log one block at a time.
+
+    With start/stop only the lines that begin inside that byte range are
+    read, so a file can be cut anywhere and every line lands in one range.
+    """
+    with open(filename, "rb") as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()
+        pos = f.tell()
+        if stop is None:
+            end = None
+        elif pos >= stop:
+            return
+        else:
+            f.seek(stop - 1)
+            f.readline()
+            end = f.tell()
+            f.seek(pos)
+
+        tail = b""
+        while end is None or pos < end:
+            want = block_size if end is None else min(block_size, end - pos)
+            block = f.read(want)
+            if not block:
+                break
+            pos += len(block)
+            block = tail + block
+            cut = block.rfind(b"\n") + 1
+            tail = block[cut:]
+            yield parse_rotations(block[:cut])
+        yield parse_rotations(tail)
+
+
+def load_rotations(filename):
+    """Read a whole rotation log into one signed-distance array."""
+    return np.concatenate(list(iter_rotation_blocks(filename)))
+
+
+def dial_walk(dist, p=50, mod=100):
+    """
+    Simulate signed distances from dial position p.
+
+    Returns (pos, hits, p_final): the position before every rotation, the
+    number of clicks landing on 0 during every rotation (what
+    count_zero_hits_during_rotation counts) and the end position.
+    """
+    n = dist.size
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), p % mod
+
+    # position before every rotation; fall back to summing dist % mod only
+    # if the raw prefix sums could overflow int64
+    mag = np.abs(dist)
+    step = dist if mag.sum(dtype=np.float64) < 2.0 ** 62 else dist % mod
+    pos = np.empty(n, dtype=np.int64)
+    pos[0] = p
+    np.cumsum(step[:-1], out=pos[1:])
+    pos[1:] += p
+    pos %= mod
+
+    # clicks to the first 0 are pos going left and (mod - pos) going right,
+    # except that from 0 itself a left turn needs a full mod clicks
+    left = dist < 0
+    first = np.where(left, pos, mod - pos)
+    hits = (mag + mod - first) // mod - (left & (pos == 0))
+
+    p_final = int((pos[-1] + step[-1]) % mod)
+    return pos, hits, p_final
+
+
+def exact_sum(a):
+    """Sum of a non-negative int array as a Python int, without int64 wrap."""
+    if a.size == 0:
+        return 0
+    if float(a.max()) * a.size < 2.0 ** 62:
+        return int(a.sum())
+    return int(a.sum(dtype=object))
+
+
+def rotation_counts(dist, p=50, mod=100):
+    """
+    Returns (stops, hits, p_final): stops is how many rotations start with the
+    dial on 0 (what day1.py counts), hits is the total number of clicks
+    landing on 0 and p_final is the end position.
+    """
+    pos, hits, p_final = dial_walk(dist, p, mod)
+    return int(np.count_nonzero(pos == 0)), exact_sum(hits), p_final
+
+
+def password_method_0x434C49434B_batch(filename):
+    p = 50
+    hits = 0
+    for dist in iter_rotation_blocks(filename):
+        _, block_hits, p = rotation_counts(dist, p)
+        hits += block_hits
+    return hits
+
+
+# ---- streaming ----
+
+class RotationStream:
+    """
+    Walk a rotation log through a memory map, one window of bytes at a time.
+
+    Iterating yields signed-distance arrays; nothing bigger than a window is
+    ever held, whatever the file size. lines and lines_per_sec can be read
+    while the stream is being consumed.
+    """
+
+    def __init__(self, filename, window=1 << 20):
+        self.filename = filename
+        self.window = window
+        self.lines = 0
+        self.started = None
+        self.finished = None
+
+    @property
+    def lines_per_sec(self):
+        if self.started is None:
+            return 0.0
+        end = self.finished if self.finished is not None else time.perf_counter()
+        elapsed = end - self.started
+        return self.lines / elapsed if elapsed > 0 else 0.0
+
+    def __iter__(self):
+        self.lines = 0
+        self.started = time.perf_counter()
+        self.finished = None
+        try:
+            yield from self._blocks()
+        finally:
+            # also runs when the consumer stops early or the generator is closed
+            self.finished = time.perf_counter()
+
+    def _blocks(self):
+        with open(self.filename, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                pos = 0
+                while pos < size:
+                    end = min(pos + self.window, size)
+                    if end < size:
+                        nl = mm.rfind(b"\n", pos, end)
+                        if nl == -1:
+                            nl = mm.find(b"\n", end)
+                        end = size if nl == -1 else nl + 1
+
+                    # parse a copy of the window, not a view into the map, so
+                    # nothing (not even a traceback on a bad line) keeps the
+                    # map from closing
+                    dist = parse_rotations(mm[pos:end])
+
+                    pos = end
+                    self.lines += dist.size
+                    yield dist
+
+    def counts(self, p=50, mod=100):
+        """Same result as rotation_counts over the whole stream."""
+        stops = hits = 0
+        for dist in self:
+            block_stops, block_hits, p = rotation_counts(dist, p, mod)
+            stops += block_stops
+            hits += block_hits
+        return stops, hits, p
+
+
+# ---- fused single pass ----
+# Every metric sees each block once, as (dist, pos, hits) arrays from
+# dial_walk, so any number of them share one read of the file. A metric only
+# needs update(dist, pos, hits) and result().
+
+class ZeroStops:
+    """Rotations that start with the dial on 0 (the day1.py answer)."""
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, dist, pos, hits):
+        self.value += int(np.count_nonzero(pos == 0))
+
+    def result(self):
+        return self.value
+
+
+class ZeroHits:
+    """Clicks that land on 0 (the day1_pt2.py answer)."""
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, dist, pos, hits):
+        self.value += exact_sum(hits)
+
+    def result(self):
+        return self.value
+
+
+class WindowedHits:
+    """Zero hits per window of size rotations; the last window may be short."""
+
+    def __init__(self, size=10000):
+        self.size = size
+        self.windows = []
+        self.partial = 0
+        self.filled = 0
+
+    def update(self, dist, pos, hits):
+        if self.filled:
+            take = min(self.size - self.filled, hits.size)
+            self.partial += exact_sum(hits[:take])
+            self.filled += take
+            hits = hits[take:]
+            if self.filled == self.size:
+                self.windows.append(self.partial)
+                self.partial = self.filled = 0
+
+        full = hits.size - hits.size % self.size
+        if full:
+            # window sums in Python ints if they could pass int64
+            big = float(hits[:full].max()) * self.size >= 2.0 ** 62
+            sums = hits[:full].reshape(-1, self.size).sum(axis=1, dtype=object if big else None)
+            self.windows.extend(int(x) for x in sums.tolist())
+
+        if full < hits.size:
+            self.partial = exact_sum(hits[full:])
+            self.filled = hits.size - full
+
+    def result(self):
+        return self.windows + [self.partial] if self.filled else list(self.windows)
+
+
+def solve_rotations(filename, metrics=(), p=50, mod=100):
+    """
+    Read a rotation log once and return both day1 answers as (stops, hits).
+    Any extra metrics are fed from the same pass; read them with result().
+    """
+    stops = ZeroStops()
+    hits = ZeroHits()
+    everything = [stops, hits, *metrics]
+    for dist in RotationStream(filename):
+        pos, block_hits, p = dial_walk(dist, p, mod)
+        for metric in everything:
+            metric.update(dist, pos, block_hits)
+    return stops.result(), hits.result()
+
+
+# ---- parallel scan ----
+# A block of rotations is summarised as a function of the position it starts
+# from: how far it moves the dial, and for every start position how many
+# rotations start on 0 and how many clicks hit 0. Summaries compose, so byte
+# ranges of a file can be summarised on separate workers and joined by a scan.
+
+def summarize_rotations(dist, mod=100):
+    """Return (offset, stops, hits) for dist, with stops/hits indexed by start."""
+    stops = np.zeros(mod, dtype=np.int64)
+    hits = np.zeros(mod, dtype=np.int64)
+    n = dist.size
+    if n == 0:
+        return 0, stops, hits
+
+    # rel[i] is the position before rotation i when starting from 0;
+    # from start s it is (s + rel[i]) % mod
+    step = dist % mod
+    rel = np.empty(n, dtype=np.int64)
+    rel[0] = 0
+    np.cumsum(step[:-1], out=rel[1:])
+    rel %= mod
+    offset = int((rel[-1] + step[-1]) % mod)
+
+    stops += np.bincount((-rel) % mod, minlength=mod)
+
+    # a rotation of a * mod + b clicks always gives a hits, plus one more
+    # when the dial starts at q in [mod - b, mod) going right or in [1, b]
+    # going left; turn those q ranges into ranges of s on a difference array
+    a, b = np.divmod(np.abs(dist), mod)
+    first = np.where(dist < 0, 1, mod - b)
+    some = b > 0
+    begin = ((first - rel) % mod)[some]
+    diff = np.bincount(begin, minlength=2 * mod)
+    diff -= np.bincount(begin + b[some], minlength=2 * mod)
+    cover = np.cumsum(diff)
+    whole = exact_sum(a)
+    if whole + n >= 2 ** 62:
+        # keep the per-start totals in Python ints once they could pass int64
+        hits = hits.astype(object)
+    hits = hits + whole + cover[:mod] + cover[mod:]
+
+    return offset, stops, hits
+
+
+def compose_summaries(first, second, mod=100):
+    """Summary of running the rotations of first, then those of second."""
+    off1, stops1, hits1 = first
+    off2, stops2, hits2 = second
+    shifted = (np.arange(mod) + off1) % mod
+    hits2 = hits2[shifted]
+    if hits1.dtype != object and float(hits1.max()) + float(hits2.max()) >= 2.0 ** 62:
+        hits1 = hits1.astype(object)
+    return (off1 + off2) % mod, stops1 + stops2[shifted], hits1 + hits2
+
+
+def summarize_byte_range(filename, start, stop, mod=100):
+    summary = summarize_rotations(np.zeros(0, dtype=np.int64), mod)
+    for dist in iter_rotation_blocks(filename, start=start, stop=stop):
+        summary = compose_summaries(summary, summarize_rotations(dist, mod), mod)
+    return summary
+
+
+def rotation_counts_parallel(filename, p=50, mod=100, workers=None, chunk_size=1 << 24):
+    """
+    Same result as rotation_counts over the whole file, with the file split
+    into byte ranges that are summarised in a process pool.
+    """
+    size = os.path.getsize(filename)
+    cuts = list(range(0, size, chunk_size)) + [size]
+    ranges = list(zip(cuts[:-1], cuts[1:]))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        summaries = pool.map(
+            summarize_byte_range,
+            repeat(filename),
+            [a for a, _ in ranges],
+            [b for _, b in ranges],
+            repeat(mod),
+        )
+        # scan: each chunk starts where the previous one left the dial
+        stops = hits = 0
+        p %= mod
+        for offset, chunk_stops, chunk_hits in summaries:
+            stops += int(chunk_stops[p])
+            hits += int(chunk_hits[p])
+            p = (p + offset) % mod
+
+    return stops, hits, p
+
+
+if __name__ == "__main__":
+    print(password_method_0x434C49434B("day1input.txt"))
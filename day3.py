@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def max_joltage(bank: str) -> int:
     bank = bank.strip()
     best_right = -1
@@ -26,5 +29,61 @@ def total_max_joltage(filename: str) -> int:
     return total
 
 
+def load_banks(filename: str) -> np.ndarray:
+    """
+    Read a file of equal-length banks into a (banks, width) uint8 matrix of
+    digit values. When the file is laid out regularly the rows are a view of
+    the file bytes, so there is no per-line work.
+    """
+    with open(filename, "rb") as f:
+        data = f.read().rstrip()
+    if not data:
+        return np.zeros((0, 0), dtype=np.uint8)
+
+    width = data.find(b"\n")
+    if width == -1:
+        width = len(data)
+    eol = 2 if width > 0 and data[width - 1:width] == b"\r" else 1
+    width -= eol - 1
+
+    stride = width + eol
+    rows = (len(data) + eol) // stride
+    grid = None
+    if rows * stride - eol == len(data):
+        buf = np.frombuffer(data, dtype=np.uint8)
+        if np.all(buf[width + eol - 1::stride] == 10) and (
+            eol == 1 or np.all(buf[width::stride] == 13)
+        ):
+            grid = np.ndarray(
+                (rows, width), dtype=np.uint8, buffer=data, strides=(stride, 1)
+            )
+    if grid is None:
+        banks = data.split()
+        if any(len(b) != width for b in banks):
+            raise ValueError("Banks must all have the same number of digits")
+        grid = np.frombuffer(b"".join(banks), dtype=np.uint8)
+        grid = grid.reshape(len(banks), width)
+
+    digits = grid - np.uint8(48)
+    if np.any(digits > 9):
+        raise ValueError("Banks must contain only digits")
+    return digits
+
+
+def max_joltages_numpy(digits: np.ndarray) -> np.ndarray:
+    """max_joltage for every row of a digit matrix at once."""
+    # best digit strictly to the right of each position
+    right = np.maximum.accumulate(digits[:, :0:-1], axis=1)[:, ::-1]
+    return (10 * digits[:, :-1] + right).max(axis=1).astype(np.int64)
+
+
+def total_max_joltage_numpy(filename: str) -> int:
+    digits = load_banks(filename)
+    if digits.shape[0] == 0:
+        return 0
+    return int(max_joltages_numpy(digits).sum())
+
+
 # example usage
-print(total_max_joltage("day3input.txt"))
+if __name__ == "__main__":
+    print(total_max_joltage("day3input.txt"))
@@ -1,3 +1,8 @@
+import numpy as np
+
+from day3 import load_banks
+
+
 def max_joltage(bank: str, k: int = 12) -> int:
     """
     Pick exactly k digits from bank (in order; cannot rearrange) to form the
@@ -36,6 +41,141 @@ def max_joltage(bank: str, k: int = 12) -> int:
 
     return int("".join(out))
 
+def max_joltage_stack(bank: str, k: int = 12) -> int:
+    """
+    Same answer as max_joltage, but O(n) for any k: walk the bank once and
+    drop the n - k digits that would make the number smallest, keeping the
+    chosen digits on a stack.
+    """
+    s = bank.strip()
+    if len(s) < k:
+        raise ValueError(f"Bank has only {len(s)} digits, need {k}")
+
+    drop = len(s) - k
+    stack = []
+    for ch in s:
+        # a bigger digit replaces smaller ones before it while we can still drop
+        while drop and stack and stack[-1] < ch:
+            stack.pop()
+            drop -= 1
+        stack.append(ch)
+
+    return int("".join(stack[:k]))
+
+
+def max_joltages(filename: str, k: int = 12) -> list[int]:
+    """Best k-digit joltage of every bank in the file, in file order."""
+    with open(filename, "r") as f:
+        return [max_joltage_stack(line, k) for line in f if line.strip()]
+
+
+class JoltageIndex:
+    """
+    Range-maximum index over one bank, for answering many k on the same bank.
+
+    table[j][i] is the position of the leftmost largest digit in
+    bank[i:i + 2**j]. Building it is O(n log n); after that best(k) costs
+    k range queries instead of a rescan of the bank.
+    """
+
+    def __init__(self, bank: str):
+        self.digits = bank.strip().encode()
+        n = len(self.digits)
+        d = self.digits
+
+        level = list(range(n))
+        self.table = [level]
+        width = 1
+        while 2 * width <= n:
+            level = [
+                a if d[a] >= d[b] else b for a, b in zip(level, level[width:])
+            ]
+            self.table.append(level)
+            width *= 2
+
+    def __len__(self) -> int:
+        return len(self.digits)
+
+    def argmax(self, lo: int, hi: int) -> int:
+        """Position of the leftmost largest digit in bank[lo:hi + 1]."""
+        j = (hi - lo + 1).bit_length() - 1
+        row = self.table[j]
+        a = row[lo]
+        b = row[hi - (1 << j) + 1]
+        return a if self.digits[a] >= self.digits[b] else b
+
+    def best(self, k: int) -> int:
+        """Same answer as max_joltage(bank, k)."""
+        n = len(self.digits)
+        if n < k:
+            raise ValueError(f"Bank has only {n} digits, need {k}")
+
+        out = bytearray()
+        start = 0
+        for pos in range(k):
+            i = self.argmax(start, n - (k - pos))
+            out.append(self.digits[i])
+            start = i + 1
+
+        return int(out)
+
+
+def build_joltage_indexes(filename: str) -> list[JoltageIndex]:
+    """One JoltageIndex per bank in the file, in file order."""
+    with open(filename, "r") as f:
+        return [JoltageIndex(line) for line in f if line.strip()]
+
+
+def select_digits(digits: np.ndarray, k: int = 12) -> np.ndarray:
+    """
+    Run the max_joltage greedy on every row of a digit matrix together.
+    Returns a (banks, k) matrix of the chosen digits.
+    """
+    rows, n = digits.shape
+    if n < k:
+        raise ValueError(f"Bank has only {n} digits, need {k}")
+
+    idx = np.int16 if n < 2 ** 15 else np.int64
+    chosen = np.empty((rows, k), dtype=np.uint8)
+    start = np.zeros(rows, dtype=idx)
+    cols = np.arange(n, dtype=idx)
+    at = np.arange(rows)
+    if rows == 0:
+        return chosen
+
+    # shift digits up by one so anything before a row's start (masked to 0)
+    # loses; argmax then gives the leftmost largest digit inside the window
+    shifted = digits + np.uint8(1)
+    for pos in range(k):
+        # same window as max_joltage: [start, n - (k - pos)], per row
+        end = n - (k - pos) + 1
+        lo = int(start.min())
+        live = cols[lo:end] >= start[:, None]
+        i = (lo + np.argmax(shifted[:, lo:end] * live, axis=1)).astype(idx)
+        chosen[:, pos] = digits[at, i]
+        start = i + 1
+
+    return chosen
+
+
+def total_max_joltage_numpy(
+    filename: str, k: int = 12, batch: int = 1 << 16
+) -> int:
+    """
+    total_max_joltage for a file of equal-length banks, with every batch of
+    rows handled by array operations instead of one bank at a time.
+    """
+    digits = load_banks(filename)
+    total = 0
+    for b in range(0, digits.shape[0], batch):
+        chosen = select_digits(digits[b:b + batch], k)
+        # add up column by column so k may exceed what fits in int64
+        col_sums = chosen.sum(axis=0, dtype=np.int64).tolist()
+        for pos, col_sum in enumerate(col_sums):
+            total += col_sum * 10 ** (k - 1 - pos)
+    return total
+
+
 def total_max_joltage(filename: str) -> int:
     total = 0
     with open(filename, "r") as f:
@@ -48,4 +188,5 @@ def total_max_joltage(filename: str) -> int:
 
 
 # example usage
-print(total_max_joltage("day3input.txt"))
\ No newline at end of file
+if __name__ == "__main__":
+    print(total_max_joltage("day3input.txt"))
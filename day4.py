@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def count_adjacent_rolls(grid, r, c):
     rows, cols = len(grid), len(grid[0])
     cnt = 0
@@ -24,4 +27,44 @@ def accessible_rolls(filename, threshold=4):
 
     return total
 
-print(accessible_rolls("day4input.txt"))
\ No newline at end of file
+def roll_grid(grid):
+    """
+    Turn grid lines into a uint8 array with 1 for every '@' and a border of
+    zeros one cell wide, so neighbours can be read with plain slices.
+    """
+    rows = len(grid)
+    cols = max((len(line) for line in grid), default=0)
+    rolls = np.zeros((rows + 2, cols + 2), dtype=np.uint8)
+    for r, line in enumerate(grid):
+        row = np.frombuffer(line.encode(), dtype=np.uint8)
+        rolls[r + 1, 1:1 + row.size] = row == ord('@')
+    return rolls
+
+
+def neighbour_counts(rolls):
+    """
+    8-neighbour roll count of every cell of a padded roll_grid array, as an
+    array of the same shape (the border stays 0).
+    """
+    counts = np.zeros_like(rolls)
+    inner = counts[1:-1, 1:-1]
+    h, w = inner.shape
+    for dr in (0, 1, 2):
+        for dc in (0, 1, 2):
+            if dr == 1 and dc == 1:
+                continue
+            inner += rolls[dr:dr + h, dc:dc + w]
+    return counts
+
+
+def accessible_rolls_numpy(filename, threshold=4):
+    with open(filename, "r") as f:
+        grid = [line.rstrip("\n") for line in f if line.strip()]
+
+    rolls = roll_grid(grid)
+    counts = neighbour_counts(rolls)
+    return int(np.count_nonzero(rolls & (counts < threshold)))
+
+
+if __name__ == "__main__":
+    print(accessible_rolls("day4input.txt"))
@@ -1,3 +1,8 @@
+import numpy as np
+
+from day4 import neighbour_counts, roll_grid
+
+
 def count_adjacent_rolls(grid, r, c):
     rows, cols = len(grid), len(grid[0])
     cnt = 0
@@ -11,49 +16,169 @@ def count_adjacent_rolls(grid, r, c):
     return cnt
 
 
+def flat_counts(rolls):
+    """
+    Neighbour counts for a padded roll_grid array, border cells included, so
+    every cell's count can be decremented safely.
+    """
+    return neighbour_counts(np.pad(rolls, 1))[1:-1, 1:-1]
+
+
+def peel_turns(roll, count, turn, offsets, threshold):
+    """
+    Run removal turns on flat padded roll/count bytearrays, starting from the
+    rolls in turn (already marked removed). Returns the size of every turn.
+
+    Every roll is queued at most once, when its count first drops below
+    threshold, and marked removed right away; only neighbours of removed
+    rolls are touched, so the whole peel is O(cells).
+    """
+    removed = []
+    while turn:
+        removed.append(len(turn))
+        next_turn = []
+        for i in turn:
+            for o in offsets:
+                j = i + o
+                count[j] -= 1
+                if roll[j] and count[j] < threshold:
+                    roll[j] = 0
+                    next_turn.append(j)
+        turn = next_turn
+    return removed
+
+
+def peel_rolls(grid, threshold=4):
+    """
+    Remove accessible rolls turn by turn until none are left and return how
+    many were removed in each turn.
+    """
+    rolls = roll_grid(grid)
+    counts = flat_counts(rolls)
+
+    # flat copies of the padded arrays; the zero border means neighbours never
+    # need bounds checks
+    w = rolls.shape[1]
+    offsets = (-w - 1, -w, -w + 1, -1, 1, w - 1, w, w + 1)
+    roll = bytearray(rolls.tobytes())
+    count = bytearray(counts.tobytes())
+
+    turn = np.flatnonzero(rolls & (counts < threshold)).tolist()
+    for i in turn:
+        roll[i] = 0
+
+    return peel_turns(roll, count, turn, offsets, threshold)
+
+
+class RollIndex:
+    """
+    A warehouse grid kept in memory under a stream of roll add/remove events.
+
+    Neighbour counts and the number of accessible rolls are updated on every
+    event in O(1), so accessible is always current. cascade() runs the
+    day4_pt2 removal turns from whatever the grid looks like now.
+    """
+
+    def __init__(self, grid, threshold=4):
+        rolls = roll_grid(grid)
+        counts = flat_counts(rolls)
+        self.rows = rolls.shape[0] - 2
+        self.cols = rolls.shape[1] - 2
+        self.threshold = threshold
+
+        w = rolls.shape[1]
+        self.width = w
+        self.offsets = (-w - 1, -w, -w + 1, -1, 1, w - 1, w, w + 1)
+        self.roll = bytearray(rolls.tobytes())
+        self.count = bytearray(counts.tobytes())
+        self.accessible = int(np.count_nonzero(rolls & (counts < threshold)))
+
+    @classmethod
+    def from_file(cls, filename, threshold=4):
+        with open(filename, "r") as f:
+            grid = [line.rstrip("\n") for line in f if line.strip()]
+        return cls(grid, threshold)
+
+    def _cell(self, r, c):
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            raise IndexError(f"Cell ({r}, {c}) is outside the grid")
+        return (r + 1) * self.width + c + 1
+
+    def has_roll(self, r, c):
+        return bool(self.roll[self._cell(r, c)])
+
+    def add(self, r, c):
+        """Put a roll at (r, c). Returns False if one was already there."""
+        i = self._cell(r, c)
+        if self.roll[i]:
+            return False
+
+        roll, count, threshold = self.roll, self.count, self.threshold
+        for o in self.offsets:
+            j = i + o
+            count[j] += 1
+            # a neighbour that just reached threshold is no longer accessible
+            if roll[j] and count[j] == threshold:
+                self.accessible -= 1
+
+        roll[i] = 1
+        if count[i] < threshold:
+            self.accessible += 1
+        return True
+
+    def remove(self, r, c):
+        """Take the roll at (r, c) away. Returns False if there was none."""
+        i = self._cell(r, c)
+        if not self.roll[i]:
+            return False
+
+        roll, count, threshold = self.roll, self.count, self.threshold
+        roll[i] = 0
+        if count[i] < threshold:
+            self.accessible -= 1
+
+        for o in self.offsets:
+            j = i + o
+            count[j] -= 1
+            if roll[j] and count[j] == threshold - 1:
+                self.accessible += 1
+        return True
+
+    def cascade(self):
+        """
+        Remove accessible rolls turn by turn from the current state, as
+        day4_pt2 does, and return how many were removed in each turn.
+        """
+        roll, count, threshold = self.roll, self.count, self.threshold
+        # views over the bytearrays, only used for the seed turn
+        rolls = np.frombuffer(roll, dtype=np.uint8)
+        counts = np.frombuffer(count, dtype=np.uint8)
+        turn = np.flatnonzero(rolls & (counts < threshold)).tolist()
+        del rolls, counts
+        for i in turn:
+            roll[i] = 0
+
+        removed = peel_turns(roll, count, turn, self.offsets, threshold)
+        # peeling stops only once no roll is below threshold
+        self.accessible = 0
+        return removed
+
+
 def total_removable_rolls_from_file(filename, threshold=4):
     # load grid
     with open(filename, "r") as f:
-        grid = [list(line.rstrip("\n")) for line in f if line.strip()]
+        grid = [line.rstrip("\n") for line in f if line.strip()]
 
-    rows, cols = len(grid), len(grid[0])
-    removed_total = 0
-
-    while True:
-        # find all currently-accessible rolls (based on current grid)
-        to_remove = []
-        for r in range(rows):
-            for c in range(cols):
-                if grid[r][c] == '@':
-                    # count neighbors using the current grid
-                    # (count_adjacent_rolls expects list[str], so join rows temporarily)
-                    pass
-
-        # efficient neighbor count directly on list[list[str]]
-        for r in range(rows):
-            for c in range(cols):
-                if grid[r][c] != '@':
-                    continue
-                cnt = 0
-                for dr in (-1, 0, 1):
-                    for dc in (-1, 0, 1):
-                        if dr == 0 and dc == 0:
-                            continue
-                        rr, cc = r + dr, c + dc
-                        if 0 <= rr < rows and 0 <= cc < cols and grid[rr][cc] == '@':
-                            cnt += 1
-                if cnt < threshold:
-                    to_remove.append((r, c))
-
-        if not to_remove:
-            break
-
-        # remove them all at once (one "turn")
-        for r, c in to_remove:
-            grid[r][c] = '.'
-
-        removed_total += len(to_remove)
-
-    return removed_total
-
-print(total_removable_rolls_from_file("day4input.txt"))
\ No newline at end of file
+    return sum(peel_rolls(grid, threshold))
+
+
+def removal_turns_from_file(filename, threshold=4):
+    """How many rolls are removed in each turn, in order."""
+    with open(filename, "r") as f:
+        grid = [line.rstrip("\n") for line in f if line.strip()]
+
+    return peel_rolls(grid, threshold)
+
+
+if __name__ == "__main__":
+    print(total_removable_rolls_from_file("day4input.txt"))
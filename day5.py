@@ -1,5 +1,7 @@
 from bisect import bisect_right
 
+import numpy as np
+
 def read_database(filename):
     with open(filename, "r") as f:
         lines = [line.strip() for line in f]
@@ -43,11 +45,169 @@ def is_fresh(merged_ranges, x):
     return a <= x <= b
 
 
+class IntervalSet:
+    """
+    Fresh ranges merged once into sorted, disjoint starts/ends lists, for
+    answering many lookups without rebuilding anything.
+    """
+
+    def __init__(self, ranges):
+        merged = merge_ranges(list(ranges))
+        self.starts = [a for a, _ in merged]
+        self.ends = [b for _, b in merged]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __contains__(self, x):
+        idx = bisect_right(self.starts, x) - 1
+        return idx >= 0 and x <= self.ends[idx]
+
+    def count_members(self, ids):
+        """How many of ids are inside: sort them, then walk both lists once."""
+        starts, ends = self.starts, self.ends
+        n = len(starts)
+        count = 0
+        k = 0
+        for x in sorted(ids):
+            while k < n and ends[k] < x:
+                k += 1
+            if k == n:
+                break
+            if x >= starts[k]:
+                count += 1
+        return count
+
+
 def count_fresh_ids(filename):
     ranges, ids = read_database(filename)
-    merged = merge_ranges(ranges)
-    return sum(1 for x in ids if is_fresh(merged, x))
+    return IntervalSet(ranges).count_members(ids)
+
+
+# ---- array mode ----
+# IDs are parsed block by block straight into int64 arrays and classified with
+# one searchsorted per block. IDs of 2**63 and up go to a uint64 array, and
+# only IDs beyond 64 bits fall back to exact Python ints.
+
+INT64_MIN, INT64_MAX = -(2 ** 63), 2 ** 63 - 1
+UINT64_MAX = 2 ** 64 - 1
+
+
+def parse_ids(data):
+    """
+    Parse a bytes buffer of complete ID lines. Returns (small, other): an
+    int64 array of every plain ID of up to 18 digits, and a list of Python
+    ints for the rest (longer, signed or padded lines). Blank lines are
+    skipped.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    if buf.size == 0:
+        return np.zeros(0, dtype=np.int64), []
+    if buf[-1] != 10:
+        buf = np.append(buf, np.uint8(10))
+
+    ends = np.flatnonzero(buf == 10)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    ends -= (ends > starts) & (buf[ends - 1] == 13)
+    width = ends - starts
+
+    # a line is plain unless some byte before its end is not a digit
+    plain = (width >= 1) & (width <= 18)
+    odd = np.flatnonzero((buf - np.uint8(48) >= 10) & (buf != 10))
+    owner = np.searchsorted(ends, odd)
+    plain[owner[odd < ends[owner]]] = False
+
+    lo = starts[plain]
+    hi = ends[plain]
+    small = np.zeros(lo.size, dtype=np.int64)
+    for k in range(int(width[plain].max()) if lo.size else 0):
+        digit = buf[np.minimum(lo + k, hi)] - np.uint8(48)
+        small = np.where(digit < 10, small * 10 + digit, small)
+
+    other = []
+    for a, b in zip(starts[~plain].tolist(), ends[~plain].tolist()):
+        line = bytes(buf[a:b]).strip()
+        if line:
+            other.append(int(line))
+
+    return small, other
+
+
+def iter_id_blocks(filename, block_size=1 << 24):
+    """
+    Yield (ranges, None) once for the range section, then (None, ids) for
+    every block of the ID section, with ids as returned by parse_ids.
+    """
+    with open(filename, "rb") as f:
+        ranges = []
+        for line in f:
+            line = line.strip()
+            if not line:
+                break
+            a, b = map(int, line.split(b"-"))
+            ranges.append((a, b))
+        yield ranges, None
+
+        tail = b""
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            block = tail + block
+            cut = block.rfind(b"\n") + 1
+            tail = block[cut:]
+            yield None, parse_ids(block[:cut])
+        yield None, parse_ids(tail)
+
+
+def interval_arrays(intervals, lo, hi, dtype):
+    """starts/ends arrays of the intervals clipped to [lo, hi]."""
+    inside = [
+        (max(a, lo), min(b, hi)) for a, b in intervals if b >= lo and a <= hi
+    ]
+    starts = np.array([a for a, _ in inside], dtype=dtype)
+    ends = np.array([b for _, b in inside], dtype=dtype)
+    return starts, ends
+
+
+def count_inside(starts, ends, ids):
+    """How many of ids fall in the sorted, disjoint [starts, ends] intervals."""
+    if starts.size == 0 or ids.size == 0:
+        return 0
+    # sorted queries make searchsorted walk the intervals far more cheaply
+    ids = np.sort(ids)
+    idx = np.searchsorted(starts, ids, side="right") - 1
+    inside = (idx >= 0) & (ids <= ends[np.maximum(idx, 0)])
+    return int(np.count_nonzero(inside))
+
+
+def count_fresh_ids_numpy(filename):
+    blocks = iter_id_blocks(filename)
+    ranges, _ = next(blocks)
+    fresh_set = IntervalSet(ranges)
+    merged = list(zip(fresh_set.starts, fresh_set.ends))
+
+    starts64, ends64 = interval_arrays(merged, INT64_MIN, INT64_MAX, np.int64)
+    startsu, endsu = interval_arrays(merged, INT64_MAX + 1, UINT64_MAX, np.uint64)
+
+    total = 0
+    for _, (small, other) in blocks:
+        total += count_inside(starts64, ends64, small)
+        if not other:
+            continue
+
+        mid = [x for x in other if INT64_MIN <= x <= INT64_MAX]
+        wide = [x for x in other if INT64_MAX < x <= UINT64_MAX]
+        huge = [x for x in other if x < INT64_MIN or x > UINT64_MAX]
+        total += count_inside(starts64, ends64, np.array(mid, dtype=np.int64))
+        total += count_inside(startsu, endsu, np.array(wide, dtype=np.uint64))
+        total += fresh_set.count_members(huge)
+
+    return total
 
 
 # example usage:
-print(count_fresh_ids("day5input.txt"))
+if __name__ == "__main__":
+    print(count_fresh_ids("day5input.txt"))
@@ -1,13 +1,21 @@
-def read_ranges_only(filename):
-    ranges = []
+from bisect import bisect_left, bisect_right
+import heapq
+import os
+import tempfile
+
+
+def iter_ranges(filename):
     with open(filename, "r") as f:
         for line in f:
             line = line.strip()
             if line == "":   # stop at the blank line
                 break
             a, b = map(int, line.split("-"))
-            ranges.append((a, b))
-    return ranges
+            yield a, b
+
+
+def read_ranges_only(filename):
+    return list(iter_ranges(filename))
 
 
 def merge_ranges(ranges):
@@ -24,11 +32,144 @@ def merge_ranges(ranges):
     return [(a, b) for a, b in merged]
 
 
-def count_total_fresh_ids(filename):
-    ranges = read_ranges_only(filename)
-    merged = merge_ranges(ranges)
+class FreshRanges:
+    """
+    Fresh ID ranges that change over time, kept as sorted lists of disjoint,
+    non-touching starts and ends. Lookups are bisects, and total (the
+    count_total_fresh_ids answer) is updated by every add or remove, so it is
+    always available without a re-merge.
+    """
+
+    def __init__(self, ranges=()):
+        merged = merge_ranges(list(ranges))
+        self.starts = [a for a, _ in merged]
+        self.ends = [b for _, b in merged]
+        self.total = sum((b - a + 1) for a, b in merged)
+
+    @classmethod
+    def from_file(cls, filename):
+        return cls(read_ranges_only(filename))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    def __contains__(self, x):
+        i = bisect_right(self.starts, x) - 1
+        return i >= 0 and x <= self.ends[i]
+
+    def _covered(self, i, j):
+        return sum(self.ends[k] - self.starts[k] + 1 for k in range(i, j))
+
+    def add_range(self, a, b):
+        if a > b:
+            raise ValueError(f"Bad range {a}-{b}")
+        # every stored range overlapping or touching [a, b] is in [i, j)
+        i = bisect_left(self.ends, a - 1)
+        j = bisect_right(self.starts, b + 1)
+        if i < j:
+            a = min(a, self.starts[i])
+            b = max(b, self.ends[j - 1])
+            self.total -= self._covered(i, j)
+        self.starts[i:j] = [a]
+        self.ends[i:j] = [b]
+        self.total += b - a + 1
+
+    def remove_range(self, a, b):
+        if a > b:
+            raise ValueError(f"Bad range {a}-{b}")
+        # every stored range overlapping [a, b] is in [i, j)
+        i = bisect_left(self.ends, a)
+        j = bisect_right(self.starts, b)
+        if i >= j:
+            return
+        keep_starts = []
+        keep_ends = []
+        if self.starts[i] < a:
+            keep_starts.append(self.starts[i])
+            keep_ends.append(a - 1)
+        if self.ends[j - 1] > b:
+            keep_starts.append(b + 1)
+            keep_ends.append(self.ends[j - 1])
+
+        self.total -= self._covered(i, j)
+        self.starts[i:j] = keep_starts
+        self.ends[i:j] = keep_ends
+        self.total += sum(e - s + 1 for s, e in zip(keep_starts, keep_ends))
+
+
+# ---- external merge ----
+# For range sections bigger than memory: ranges are read in runs of at most
+# run_size, each run is sorted, merged and written to a temp file, and the
+# runs are then k-way merged with heapq while coalescing.
+
+def write_run(ranges, directory):
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "w") as f:
+        for a, b in ranges:
+            f.write(f"{a}-{b}\n")
+    return path
+
+
+def read_run(path):
+    with open(path, "r") as f:
+        for line in f:
+            a, b = map(int, line.split("-"))
+            yield a, b
+
+
+def coalesce(sorted_ranges):
+    """Merge overlapping or touching ranges from an already sorted stream."""
+    cur_a = cur_b = None
+    for a, b in sorted_ranges:
+        if cur_a is None:
+            cur_a, cur_b = a, b
+        elif a <= cur_b + 1:
+            cur_b = max(cur_b, b)
+        else:
+            yield cur_a, cur_b
+            cur_a, cur_b = a, b
+    if cur_a is not None:
+        yield cur_a, cur_b
+
+
+def merge_ranges_external(filename, run_size=1_000_000, fan_in=64):
+    """
+    Yield the merged ranges of filename in order, holding at most run_size
+    ranges (or fan_in open runs) in memory at a time.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        runs = []
+        run = []
+        for r in iter_ranges(filename):
+            run.append(r)
+            if len(run) == run_size:
+                runs.append(write_run(merge_ranges(run), directory))
+                run = []
+        if run or not runs:
+            runs.append(write_run(merge_ranges(run), directory))
+
+        # too many runs to open at once: merge them in groups first
+        while len(runs) > fan_in:
+            group, runs = runs[:fan_in], runs[fan_in:]
+            merged = coalesce(heapq.merge(*(read_run(p) for p in group)))
+            runs.append(write_run(merged, directory))
+            for path in group:
+                os.remove(path)
+
+        yield from coalesce(heapq.merge(*(read_run(p) for p in runs)))
+
+
+def count_total_fresh_ids(filename, run_size=None):
+    if run_size is not None:
+        merged = merge_ranges_external(filename, run_size)
+    else:
+        merged = merge_ranges(read_ranges_only(filename))
     return sum((b - a + 1) for a, b in merged)
 
 
 # example usage:
-print(count_total_fresh_ids("day5input.txt"))
+if __name__ == "__main__":
+    print(count_total_fresh_ids("day5input.txt"))
@@ -1,6 +1,10 @@
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from math import prod
 
+import numpy as np
+
 def split_into_blocks(lines):
     # IMPORTANT: do NOT strip() here; keep leading spaces.
     lines = [line.rstrip("\n").rstrip("\r") for line in lines]
@@ -69,5 +73,207 @@ def worksheet_total(filename):
     return total
 
 
+# ---- columnar parser ----
+
+class Worksheet:
+    """
+    A worksheet parsed once from its bytes, for both readings of the numbers.
+
+    grid is a (rows, width) uint8 array; when every line has the same length
+    it is a strided view of the file bytes rather than a padded copy.
+    Separator columns come from one all-space reduction over the columns.
+    """
+
+    def __init__(self, data):
+        # ignore trailing empty lines without copying the buffer
+        size = len(data)
+        while size and data[size - 1] in b"\r\n":
+            size -= 1
+
+        width = data.find(b"\n", 0, size)
+        if width == -1:
+            width = size
+        eol = 2 if width and data[width - 1] == ord("\r") else 1
+        width -= eol - 1
+        stride = width + eol
+        rows = (size + eol) // stride
+
+        grid = None
+        if rows * stride - eol == size:
+            buf = np.frombuffer(data, dtype=np.uint8, count=size)
+            if np.all(buf[stride - 1::stride] == ord("\n")) and (
+                eol == 1 or np.all(buf[width::stride] == ord("\r"))
+            ):
+                grid = np.ndarray(
+                    (rows, width), dtype=np.uint8, buffer=data, strides=(stride, 1)
+                )
+        if grid is None:
+            # ragged lines: pad with spaces, like ljust in split_into_blocks
+            lines = [line.rstrip(b"\r") for line in data[:size].split(b"\n")]
+            width = max(len(line) for line in lines)
+            grid = np.full((len(lines), width), ord(" "), dtype=np.uint8)
+            for r, line in enumerate(lines):
+                grid[r, :len(line)] = np.frombuffer(line, dtype=np.uint8)
+        self.grid = grid
+
+        sep = np.all(grid == ord(" "), axis=0)
+        edges = np.diff(np.concatenate(([1], sep.astype(np.int8), [1])))
+        self.starts = np.flatnonzero(edges == -1)
+        self.ends = np.flatnonzero(edges == 1)
+
+        # operator of every block: the first '+' or '*' in its part of the
+        # last row (None when there is none)
+        op_row = grid[-1]
+        at = np.flatnonzero((op_row == ord("+")) | (op_row == ord("*")))
+        block = np.searchsorted(self.starts, at, side="right") - 1
+        block, first = np.unique(block, return_index=True)
+        self.ops = [None] * len(self.starts)
+        for b, c in zip(block.tolist(), at[first].tolist()):
+            self.ops[b] = chr(op_row[c])
+
+    @classmethod
+    def from_file(cls, filename):
+        with open(filename, "rb") as f:
+            return cls(f.read())
+
+    @property
+    def blocks(self):
+        return list(zip(self.starts.tolist(), self.ends.tolist()))
+
+    def _block_of(self, cols):
+        return np.searchsorted(self.starts, cols, side="right") - 1
+
+    def row_numbers(self):
+        """
+        Part 1 reading: the first number of every row in each block, as
+        (block, value) arrays ordered by block.
+        """
+        blocks = []
+        values = []
+        for row in self.grid[:-1]:
+            digit = row - np.uint8(48)
+            is_digit = digit < 10
+            before = np.concatenate(([False], is_digit[:-1]))
+            after = np.concatenate((is_digit[1:], [False]))
+            begin = np.flatnonzero(is_digit & ~before)
+            end = np.flatnonzero(is_digit & ~after) + 1
+
+            # only the first number of a row counts inside each block
+            block = self._block_of(begin)
+            first = np.ones(block.size, dtype=bool)
+            first[1:] = block[1:] != block[:-1]
+            begin, end, block = begin[first], end[first], block[first]
+
+            # build the numbers one digit column at a time
+            length = end - begin
+            widest = int(length.max()) if length.size else 0
+            value = np.zeros(block.size, dtype=np.int64 if widest <= 18 else object)
+            for k in range(widest):
+                more = length > k
+                d = digit[np.where(more, begin + k, 0)].astype(value.dtype)
+                value = np.where(more, value * 10 + d, value)
+
+            blocks.append(block)
+            values.append(value)
+
+        block = np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.int64)
+        value = np.concatenate(values) if values else np.zeros(0, dtype=np.int64)
+        order = np.argsort(block, kind="stable")
+        return block[order], value[order]
+
+    def column_numbers(self):
+        """
+        Part 2 reading: every column holding digits is one number, read top
+        to bottom, as (block, value) arrays ordered by block. (Blocks are read
+        right to left in the puzzle, but sums and products do not care.)
+        """
+        digits = self.grid[:-1] - np.uint8(48)
+        is_digit = digits < 10
+        # top-to-bottom digits of every column at once; fall back to exact
+        # Python ints when the rows could overflow int64
+        dtype = np.int64 if digits.shape[0] <= 18 else object
+        value = np.zeros(self.grid.shape[1], dtype=dtype)
+        for d, m in zip(digits.astype(dtype), is_digit):
+            value = np.where(m, value * 10 + d, value)
+
+        cols = np.flatnonzero(is_digit.any(axis=0))
+        return self._block_of(cols), value[cols]
+
+    def split(self, block, value):
+        """
+        Group one reading by operator: (plus, groups), where plus holds every
+        number of the '+' blocks and groups the numbers of each '*' block.
+        Blocks without an operator are left out.
+        """
+        ops = np.array([op or " " for op in self.ops])
+        plus = value[(ops == "+")[block]].tolist()
+
+        times = (ops == "*")[block]
+        nums = value[times].tolist()
+        owner = block[times]
+        wanted = np.flatnonzero(ops == "*")
+        lo = np.searchsorted(owner, wanted, side="left").tolist()
+        hi = np.searchsorted(owner, wanted, side="right").tolist()
+        return plus, [nums[a:b] for a, b in zip(lo, hi)]
+
+    def total(self, block, value):
+        return evaluate_blocks(*self.split(block, value))
+
+
+def product_tree(nums):
+    """
+    prod(nums), multiplying neighbours pairwise so both sides of every big
+    multiplication stay about the same size. Short lists just use prod.
+    """
+    if len(nums) <= 8:
+        return prod(nums)
+    while len(nums) > 1:
+        paired = [a * b for a, b in zip(nums[0::2], nums[1::2])]
+        if len(nums) % 2:
+            paired.append(nums[-1])
+        nums = paired
+    return nums[0]
+
+
+def evaluate_blocks(plus, groups):
+    return sum(plus) + sum(product_tree(g) for g in groups)
+
+
+def worksheet_totals(filename):
+    """(worksheet_total, worksheet_total_rtl_columns) from one parse."""
+    sheet = Worksheet.from_file(filename)
+    return sheet.total(*sheet.row_numbers()), sheet.total(*sheet.column_numbers())
+
+
+def worksheet_totals_parallel(filename, workers=None):
+    """
+    worksheet_totals with the blocks spread over a process pool; each worker
+    adds up its share of the '+' numbers and multiplies out its share of the
+    '*' blocks, and only the partial totals are added here.
+    """
+    sheet = Worksheet.from_file(filename)
+    shards = 4 * (workers or os.cpu_count() or 1)
+
+    totals = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for reading in (sheet.row_numbers(), sheet.column_numbers()):
+            plus, groups = sheet.split(*reading)
+            plus_step = max(1, -(-len(plus) // shards))
+            group_step = max(1, -(-len(groups) // shards))
+            parts = [
+                pool.submit(
+                    evaluate_blocks,
+                    plus[k * plus_step:(k + 1) * plus_step],
+                    groups[k * group_step:(k + 1) * group_step],
+                )
+                for k in range(shards)
+                if k * plus_step < len(plus) or k * group_step < len(groups)
+            ]
+            totals.append(sum(part.result() for part in parts))
+
+    return tuple(totals)
+
+
 # Example usage:
-print(worksheet_total("day6input.txt"))
+if __name__ == "__main__":
+    print(worksheet_total("day6input.txt"))
@@ -1,3 +1,7 @@
+import heapq
+from bisect import bisect_left
+
+
 def read_grid(filename):
     with open(filename, "r", newline="") as f:
         return [line.rstrip("\n").rstrip("\r") for line in f if line.rstrip("\n").rstrip("\r") != ""]
@@ -43,5 +47,98 @@ def count_splits(grid):
 
     return splits
 
-grid = read_grid("day7input.txt")
-print(count_splits(grid))
+# ---- bitset engine ----
+# A row becomes an int with bit c set where column c holds a splitter, and the
+# active beams are an int too, so one row is a handful of bitwise operations.
+
+SPLITTER_BITS = bytes(ord("1") if b == ord("^") else ord("0") for b in range(256))
+
+
+def splitter_mask(row):
+    bits = row.encode().translate(SPLITTER_BITS)[::-1]
+    return int(bits, 2) if bits else 0
+
+
+def count_splits_bitset(grid):
+    rows = len(grid)
+    cols = len(grid[0]) if rows else 0
+
+    s_row, s_col = find_start(grid)
+
+    inside = (1 << cols) - 1
+    active = 1 << s_col
+    splits = 0
+
+    for r in range(s_row + 1, rows):
+        if not active:
+            break
+        hit = active & splitter_mask(grid[r])
+        if hit:
+            splits += hit.bit_count()
+            # hit beams move one column left and right; the rest go straight on
+            active = (active ^ hit) | (((hit << 1) | (hit >> 1)) & inside)
+
+    return splits
+
+
+# ---- event-driven engine ----
+# Instead of walking every row, each beam jumps straight to the next splitter
+# below it using a per-column list of splitter rows. Splitter hits are events
+# in a heap ordered by row; beams that reach the same splitter merge there.
+
+def find_start(grid):
+    for r, row in enumerate(grid):
+        c = row.find("S")
+        if c != -1:
+            return r, c
+    raise ValueError("No 'S' found in grid")
+
+
+def splitter_index(grid):
+    """For every column, the sorted rows that hold a '^' in that column."""
+    cols = len(grid[0]) if grid else 0
+    index = [[] for _ in range(cols)]
+    for r, row in enumerate(grid):
+        c = row.find("^")
+        while c != -1:
+            index[c].append(r)
+            c = row.find("^", c + 1)
+    return index
+
+
+def next_splitter(index, r, c):
+    """Row of the first splitter at or below row r in column c, or None."""
+    col = index[c]
+    i = bisect_left(col, r)
+    return col[i] if i < len(col) else None
+
+
+def count_splits_events(grid):
+    cols = len(grid[0]) if grid else 0
+    s_row, s_col = find_start(grid)
+    index = splitter_index(grid)
+
+    events = []
+    seen = set()
+
+    def fall(r, c):
+        if 0 <= c < cols:
+            hit = next_splitter(index, r, c)
+            if hit is not None and (hit, c) not in seen:
+                seen.add((hit, c))
+                heapq.heappush(events, (hit, c))
+
+    fall(s_row + 1, s_col)
+    splits = 0
+    while events:
+        r, c = heapq.heappop(events)
+        splits += 1
+        fall(r + 1, c - 1)
+        fall(r + 1, c + 1)
+
+    return splits
+
+
+if __name__ == "__main__":
+    grid = read_grid("day7input.txt")
+    print(count_splits(grid))
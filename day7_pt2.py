@@ -1,3 +1,10 @@
+import heapq
+
+import numpy as np
+
+from day7 import find_start, next_splitter, splitter_index
+
+
 def read_grid(filename):
     with open(filename, "r", newline="") as f:
         return [line.rstrip("\n").rstrip("\r") for line in f if line.strip() != ""]
@@ -52,5 +59,155 @@ def count_timelines(grid):
     exited += sum(ways.values())
     return exited
 
-grid = read_grid("day7input.txt")
-print(count_timelines(grid))
+def count_timelines_dense(grid):
+    """
+    count_timelines with the counts in a preallocated per-column vector,
+    double-buffered between rows. Counts stay int64 while they are sure to
+    fit and switch to exact Python ints (an object array) once they might
+    overflow.
+    """
+    rows = len(grid)
+    cols = len(grid[0]) if rows else 0
+    if rows == 0 or cols == 0:
+        return 0
+
+    s_row, s_col = find_start(grid)
+
+    ways = np.zeros(cols, dtype=np.int64)
+    nxt = np.zeros(cols, dtype=np.int64)
+    hit = np.zeros(cols, dtype=np.int64)
+    ways[s_col] = 1
+    exited = 0
+
+    # one row can at most triple a count (straight on plus both neighbours)
+    limit = np.iinfo(np.int64).max // 3
+    # columns that can hold a timeline; both buffers are 0 outside them
+    lo = hi = s_col
+
+    for r in range(s_row + 1, rows):
+        row = np.frombuffer(grid[r].encode(), dtype=np.uint8)
+        splitter = row[lo:hi + 1] == ord("^")
+        if not splitter.any():
+            continue
+
+        if ways.dtype != object and ways[lo:hi + 1].max() > limit:
+            ways, nxt, hit = (a.astype(object) for a in (ways, nxt, hit))
+
+        lo = max(lo - 1, 0)
+        hi = min(hi + 1, cols - 1)
+        splitter = row[lo:hi + 1] == ord("^")
+        w, n, h = ways[lo:hi + 1], nxt[lo:hi + 1], hit[lo:hi + 1]
+
+        # split: hit counts go down-left and down-right, the rest straight down
+        np.multiply(w, splitter, out=h)
+        np.subtract(w, h, out=n)
+        n[:-1] += h[1:]
+        n[1:] += h[:-1]
+        if lo == 0:
+            exited += int(h[0])
+        if hi == cols - 1:
+            exited += int(h[-1])
+        ways, nxt = nxt, ways
+
+    # any timelines still in-grid after the last row exit out the bottom
+    return exited + sum(ways.tolist())
+
+
+def count_timelines_events(grid):
+    """
+    count_timelines driven by splitter hits only: every bucket of timelines
+    jumps to the next splitter below it, and buckets reaching the same
+    splitter are merged there, in row order.
+    """
+    rows = len(grid)
+    cols = len(grid[0]) if rows else 0
+    if rows == 0 or cols == 0:
+        return 0
+
+    s_row, s_col = find_start(grid)
+    index = splitter_index(grid)
+
+    events = []
+    pending = {}   # (row, col) of a splitter -> timelines arriving there
+    exited = 0
+
+    def fall(r, c, w):
+        nonlocal exited
+        if not 0 <= c < cols:
+            exited += w
+            return
+        hit = next_splitter(index, r, c)
+        if hit is None:
+            exited += w   # straight out of the bottom
+        elif (hit, c) in pending:
+            pending[hit, c] += w
+        else:
+            pending[hit, c] = w
+            heapq.heappush(events, (hit, c))
+
+    fall(s_row + 1, s_col, 1)
+    while events:
+        r, c = heapq.heappop(events)
+        w = pending.pop((r, c))
+        fall(r + 1, c - 1, w)
+        fall(r + 1, c + 1, w)
+
+    return exited
+
+
+class TimelineTable:
+    """
+    Timeline counts for every possible start cell, from one bottom-up pass.
+
+    timelines(row, col) is what count_timelines would return with the 'S' at
+    (row, col). The pass keeps a single row buffer; only the rows asked for
+    in keep_rows (all rows by default) are saved, and saved rows with no
+    splitter between them share one list.
+    """
+
+    def __init__(self, grid, keep_rows=None):
+        rows = len(grid)
+        self.cols = cols = len(grid[0]) if rows else 0
+        keep = range(rows) if keep_rows is None else set(keep_rows)
+
+        # counts for a particle entering the current row going down; below
+        # the last row every particle is one timeline
+        counts = [1] * cols
+        self.saved = {}
+        last = None
+        for r in range(rows - 1, -1, -1):
+            # a start at row r enters row r + 1, whose counts are in the buffer
+            if r in keep:
+                if last is None:
+                    last = counts.copy()
+                self.saved[r] = last
+
+            # work out the whole row from the old buffer before writing it
+            new = []
+            c = grid[r].find("^")
+            while c != -1:
+                left = counts[c - 1] if c > 0 else 1
+                right = counts[c + 1] if c + 1 < cols else 1
+                new.append((c, left + right))
+                c = grid[r].find("^", c + 1)
+            if new:
+                for c, v in new:
+                    counts[c] = v
+                last = None
+
+    def timelines(self, row, col):
+        if row not in self.saved:
+            raise KeyError(f"Row {row} was not kept")
+        if not 0 <= col < self.cols:
+            raise IndexError(f"Column {col} is outside the grid")
+        return self.saved[row][col]
+
+
+def count_timelines_table(grid):
+    s_row, s_col = find_start(grid)
+    return TimelineTable(grid, keep_rows=[s_row]).timelines(s_row, s_col)
+
+
+if __name__ == "__main__":
+    grid = read_grid("day7input.txt")
+    print(count_timelines(grid))
@@ -1,25 +1,10 @@
-from collections import Counter
-
-class DSU:
-    def __init__(self, n):
-        self.parent = list(range(n))
-        self.size = [1] * n
-
-    def find(self, x):
-        while self.parent[x] != x:
-            self.parent[x] = self.parent[self.parent[x]]
-            x = self.parent[x]
-        return x
-
-    def union(self, a, b):
-        ra, rb = self.find(a), self.find(b)
-        if ra == rb:
-            return False
-        if self.size[ra] < self.size[rb]:
-            ra, rb = rb, ra
-        self.parent[rb] = ra
-        self.size[ra] += self.size[rb]
-        return True
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+
+import numpy as np
+
+from dsu import DSU
 
 
 def multiply_top3_after_k_connections(filename, k=1000):
@@ -57,13 +42,10 @@ def multiply_top3_after_k_connections(filename, k=1000):
     edges.sort(key=lambda t: t[0])
 
     # 3) attempt first k connections (or all edges if fewer exist)
-    for _, i, j in edges[:min(k, len(edges))]:
-        dsu.union(i, j)
+    dsu.union_many((i, j) for _, i, j in islice(edges, k))
 
     # 4) component sizes
-    roots = [dsu.find(i) for i in range(n)]
-    counts = Counter(roots)
-    sizes = sorted(counts.values(), reverse=True)
+    sizes = dsu.sizes()
 
     print("Parsed points:", n)
     print("Number of circuits:", len(sizes))
@@ -75,5 +57,259 @@ def multiply_top3_after_k_connections(filename, k=1000):
     return sizes[0] * sizes[1] * sizes[2]
 
 
-# example usage:
-print(multiply_top3_after_k_connections("day8input.txt", k=1000))
+# ---- k smallest edges ----
+# Only the first k edges of the sorted list are ever used, so the distances
+# are worked out one block of rows at a time and each block only hands its own
+# k best to a bounded heap. Ties go the way the stable sort above sends them:
+# by (dist2, i, j).
+
+def read_points(filename):
+    pts = []
+    with open(filename, "r", newline="") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split(",")
+            if len(parts) != 3:
+                raise ValueError(f"Bad line (expected X,Y,Z): {line!r}")
+            pts.append(tuple(map(int, parts)))
+    return pts
+
+
+def point_arrays(pts):
+    # int64 is exact while 3 * span^2 fits, otherwise fall back to Python ints.
+    # Also returns a value above every real dist2, used to blank out pairs.
+    coords = [[p[a] for p in pts] for a in range(3)]
+    span = max((max(c) - min(c) for c in coords), default=0)
+    far = 3 * span * span + 1
+    dtype = np.int64 if far < 2**63 else object
+    return [np.array(c, dtype=dtype) for c in coords], far
+
+
+def k_smallest_edges(pts, k, block_size=1 << 22):
+    n = len(pts)
+    k = min(k, n * (n - 1) // 2)
+    if k <= 0:
+        return []
+    (xs, ys, zs), far = point_arrays(pts)
+
+    heap = []  # max-heap of the k best so far, stored as (-d2, -i, -j)
+    a = 0
+    while a < n - 1:
+        cols = n - a
+        rows = max(1, min(cols - 1, block_size // cols))
+        b = a + rows
+        # rows i in [a, b) against columns j in [a, n); flat index order is
+        # (i, j) order, and pairs with j <= i are blanked out with far
+        d2 = ((xs[a:b, None] - xs[None, a:]) ** 2
+              + (ys[a:b, None] - ys[None, a:]) ** 2
+              + (zs[a:b, None] - zs[None, a:]) ** 2)
+        d2[:, :rows][np.tri(rows, dtype=bool)] = far
+        d2 = d2.ravel()
+
+        # nothing above the current worst can get in
+        keep = np.flatnonzero(d2 <= (-heap[0][0] if len(heap) == k else far - 1))
+        if len(keep) > k:
+            # the k-th value splits the block; ties on it go by flat index
+            v = np.partition(d2[keep], k - 1)[k - 1]
+            below = keep[d2[keep] < v]
+            at = keep[d2[keep] == v][:k - len(below)]
+            keep = np.concatenate((below, at))
+
+        r, c = np.divmod(keep, cols)
+        for dist2, i, j in zip(d2[keep].tolist(), (r + a).tolist(), (c + a).tolist()):
+            item = (-dist2, -i, -j)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+        a = b
+
+    return sorted((-d, -i, -j) for d, i, j in heap)
+
+
+def circuit_sizes(n, edges):
+    dsu = DSU(n)
+    dsu.union_many((i, j) for _, i, j in edges)
+    return dsu.sizes()
+
+
+def multiply_top3_smallest_edges(filename, k=1000, block_size=1 << 22):
+    pts = read_points(filename)
+    n = len(pts)
+    if n < 3:
+        raise ValueError(f"Parsed only {n} points from {filename}. Need at least 3.")
+
+    sizes = circuit_sizes(n, k_smallest_edges(pts, k, block_size))
+    if len(sizes) < 3:
+        raise ValueError(f"Only {len(sizes)} circuits exist; cannot multiply top 3.")
+    return sizes[0] * sizes[1] * sizes[2]
+
+
+# ---- lazy sorted edges ----
+# Every point keeps a cursor into a sorted run of its neighbours j > i, and a
+# heap merges the runs. A run that is used up is refilled with twice as many
+# neighbours after the last one handed out. Memory stays at about chunk edges
+# per point instead of the full edge list, but seeding the first runs is still
+# one O(n^2) sweep over all pairs before the first edge comes out; what an
+# early stop saves is the sorting and the refills, not that sweep.
+
+def next_neighbours(coords, far, rows, count, last=None):
+    # for each point i in rows (ascending), the next count neighbours j > i in
+    # (dist2, j) order, after last = (dist2, j) if given; missing ones come
+    # back as far
+    n = coords.shape[1]
+    cols = np.arange(rows[0] + 1, n)
+    d2 = ((coords[:, rows, None] - coords[:, None, rows[0] + 1:]) ** 2).sum(axis=0)
+    d2[:, :len(rows)][cols[:len(rows)] <= rows[:, None]] = far
+    if last is not None:
+        last_d2, last_j = last
+        d2[(d2 < last_d2) | ((d2 == last_d2) & (cols <= last_j))] = far
+
+    k = min(count, len(cols))
+    if k < len(cols):
+        # ties on the k-th value go by column, which is j order
+        v = np.partition(d2, k - 1, axis=1)[:, k - 1, None]
+        take = d2 < v
+        at = d2 == v
+        short = k - take.sum(axis=1)
+        tied = np.flatnonzero(at.sum(axis=1) > short)
+        at[tied] &= np.cumsum(at[tied], axis=1) <= short[tied, None]
+        take |= at
+        d2 = d2[take].reshape(len(rows), k)
+        cols = np.broadcast_to(cols, take.shape)[take].reshape(len(rows), k)
+    else:
+        cols = np.broadcast_to(cols, d2.shape)
+    order = np.argsort(d2, axis=1, kind="stable")
+    return (np.take_along_axis(d2, order, axis=1).tolist(),
+            np.take_along_axis(cols, order, axis=1).tolist())
+
+
+def sorted_edges(pts, chunk=16, block_size=1 << 22):
+    # yields (dist2, i, j) with i < j in the same order as the stable sort;
+    # the first edge costs a full O(n^2) distance sweep
+    n = len(pts)
+    if n < 2:
+        return
+    coords, far = point_arrays(pts)
+    coords = np.stack(coords)
+    runs = [None] * n
+    pos = [0] * n
+    heap = []
+
+    a = 0
+    while a < n - 1:
+        rows = np.arange(a, a + max(1, min(n - 1 - a, block_size // (n - a))))
+        d2s, js = next_neighbours(coords, far, rows, chunk)
+        for i, d2, j in zip(rows.tolist(), d2s, js):
+            runs[i] = (d2, j)
+            if d2[0] < far:
+                heap.append((d2[0], i, j[0]))
+        a += len(rows)
+    heapq.heapify(heap)
+
+    while heap:
+        dist2, i, j = heap[0]
+        yield dist2, i, j
+        d2, js = runs[i]
+        pos[i] += 1
+        if pos[i] == len(d2) and d2[-1] < far:
+            d2, js = next_neighbours(coords, far, np.array([i]), 2 * len(d2), (dist2, j))
+            d2, js = runs[i] = (d2[0], js[0])
+            pos[i] = 0
+        if pos[i] < len(d2) and d2[pos[i]] < far:
+            heapq.heapreplace(heap, (d2[pos[i]], i, js[pos[i]]))
+        else:
+            heapq.heappop(heap)
+
+
+def multiply_top3_streamed(filename, k=1000):
+    pts = read_points(filename)
+    n = len(pts)
+    if n < 3:
+        raise ValueError(f"Parsed only {n} points from {filename}. Need at least 3.")
+
+    sizes = circuit_sizes(n, islice(sorted_edges(pts), k))
+    if len(sizes) < 3:
+        raise ValueError(f"Only {len(sizes)} circuits exist; cannot multiply top 3.")
+    return sizes[0] * sizes[1] * sizes[2]
+
+
+# ---- connectivity timeline ----
+
+class ConnectionTimeline:
+    """
+    One Kruskal pass over the sorted edges, saving the state after every
+    union that joins two circuits: how many edges had been tried, the
+    circuit count and the three largest circuit sizes. The state after the
+    first k edges is then a bisect on the edge counts, so any number of k
+    values can be asked about without redoing the pass.
+    """
+
+    def __init__(self, pts, max_edges=None):
+        n = len(pts)
+        dsu = DSU(n)
+        counts = dsu.histogram  # multiset of circuit sizes
+        distinct = [1] if n else []
+
+        self.n = n
+        self.steps = [0]
+        self.circuits = [n]
+        self.top = [(1,) * min(n, 3)]
+        self.horizon = 0
+        self.complete = n < 2
+
+        for _, i, j in islice(sorted_edges(pts), max_edges):
+            self.horizon += 1
+            a, b = dsu.size[dsu.find(i)], dsu.size[dsu.find(j)]
+            if not dsu.union(i, j):
+                continue
+            for size in {a, b}:
+                if size not in counts:
+                    distinct.pop(bisect_left(distinct, size))
+            if counts[a + b] == 1:
+                insort(distinct, a + b)
+
+            top = []
+            for size in reversed(distinct):
+                top.extend([size] * min(counts[size], 3 - len(top)))
+                if len(top) == 3:
+                    break
+            self.steps.append(self.horizon)
+            self.circuits.append(self.circuits[-1] - 1)
+            self.top.append(tuple(top))
+            if self.circuits[-1] == 1:
+                self.complete = True
+                break
+        else:
+            self.complete = self.complete or max_edges is None or self.horizon < max_edges
+
+    @classmethod
+    def from_file(cls, filename, max_edges=None):
+        return cls(read_points(filename), max_edges)
+
+    def _state(self, k):
+        if k < 0:
+            raise ValueError(f"k must be non-negative, got {k}")
+        if k > self.horizon and not self.complete:
+            raise ValueError(f"Timeline only covers the first {self.horizon} edges")
+        return bisect_right(self.steps, k) - 1
+
+    def circuits_after(self, k):
+        return self.circuits[self._state(k)]
+
+    def largest_after(self, k):
+        top = self.top[self._state(k)]
+        return top[0] if top else 0
+
+    def top3_product_after(self, k):
+        top = self.top[self._state(k)]
+        if len(top) < 3:
+            raise ValueError(f"Only {len(top)} circuits exist; cannot multiply top 3.")
+        return top[0] * top[1] * top[2]
+
+
+if __name__ == "__main__":
+    # example usage:
+    print(multiply_top3_after_k_connections("day8input.txt", k=1000))
@@ -1,25 +1,7 @@
-class DSU:
-    def __init__(self, n):
-        self.parent = list(range(n))
-        self.size = [1] * n
-        self.components = n
-
-    def find(self, x):
-        while self.parent[x] != x:
-            self.parent[x] = self.parent[self.parent[x]]
-            x = self.parent[x]
-        return x
-
-    def union(self, a, b):
-        ra, rb = self.find(a), self.find(b)
-        if ra == rb:
-            return False
-        if self.size[ra] < self.size[rb]:
-            ra, rb = rb, ra
-        self.parent[rb] = ra
-        self.size[ra] += self.size[rb]
-        self.components -= 1
-        return True
+import numpy as np
+
+from day8 import point_arrays, read_points, sorted_edges
+from dsu import DSU
 
 
 def last_connection_x_product(filename):
@@ -51,18 +33,226 @@ def last_connection_x_product(filename):
     edges.sort(key=lambda t: t[0])
 
     dsu = DSU(n)
-    last_i = last_j = None
-
-    for _, i, j in edges:
-        if dsu.union(i, j):
-            last_i, last_j = i, j
-            if dsu.components == 1:
-                break
+    joined = dsu.union_many((i, j) for _, i, j in edges)
+    _, last_i, last_j = edges[joined[-1]]
 
     x1 = pts[last_i][0]
     x2 = pts[last_j][0]
     return x1 * x2
 
 
-# example:
-print(last_connection_x_product("day8input.txt"))  # should be 25272 for the example
+# ---- spatial-index MST ----
+# The last Kruskal union is the heaviest edge of the minimum spanning tree,
+# ordering edges by (dist2, i, j) like the sort above. With that strict order
+# the tree is unique, so Boruvka rounds find the same one: every component
+# picks its lightest edge to another component, found with a k-d tree that
+# skips boxes too far away or lying wholly inside the component.
+
+class KDTree:
+    def __init__(self, xs, ys, zs, leaf_size=32):
+        self.coords = np.stack([xs, ys, zs])
+        n = len(xs)
+        self.perm = np.arange(n)
+        # per node: bounding box, children (-1 at a leaf) and slice of perm
+        self.lo, self.hi = [], []
+        self.left, self.right = [], []
+        self.start, self.end = [], []
+
+        stack = [(0, n, None, None)]
+        while stack:
+            a, b, parent, side = stack.pop()
+            node = len(self.start)
+            if parent is not None:
+                (self.left if side == 0 else self.right)[parent] = node
+            box = self.coords[:, self.perm[a:b]]
+            lo, hi = box.min(axis=1), box.max(axis=1)
+            self.lo.append(tuple(lo.tolist()))
+            self.hi.append(tuple(hi.tolist()))
+            self.left.append(-1)
+            self.right.append(-1)
+            self.start.append(a)
+            self.end.append(b)
+            if b - a > leaf_size:
+                axis = int(np.argmax(hi - lo))
+                m = (a + b) // 2
+                order = np.argpartition(box[axis], m - a)
+                self.perm[a:b] = self.perm[a:b][order]
+                stack.append((m, b, node, 1))
+                stack.append((a, m, node, 0))
+        self.leaves = [v for v in range(len(self.start)) if self.left[v] == -1]
+
+    def node_labels(self, labels):
+        # label of each node if all its points share one, otherwise -1;
+        # children always come after their parent
+        lab = labels[self.perm]
+        out = [-1] * len(self.start)
+        for v in reversed(range(len(self.start))):
+            if self.left[v] == -1:
+                part = lab[self.start[v]:self.end[v]]
+                first = int(part[0])
+                out[v] = first if (part == first).all() else -1
+            else:
+                l, r = out[self.left[v]], out[self.right[v]]
+                out[v] = l if l == r else -1
+        return out
+
+
+def box_dist2(alo, ahi, blo, bhi):
+    d = 0
+    for a0, a1, b0, b1 in zip(alo, ahi, blo, bhi):
+        if b0 > a1:
+            d += (b0 - a1) ** 2
+        elif a0 > b1:
+            d += (a0 - b1) ** 2
+    return d
+
+
+def window_bounds(tree, labels, far, window):
+    # cheap upper bound per point: the nearest foreign point among its
+    # neighbours in tree order, which is spatially close
+    order = tree.perm
+    lab = labels[order]
+    pc = tree.coords[:, order]
+    ub = np.full(len(order), far, dtype=pc.dtype)
+    for off in range(1, min(window, len(order) - 1) + 1):
+        d2 = ((pc[:, off:] - pc[:, :-off]) ** 2).sum(axis=0)
+        d2[lab[off:] == lab[:-off]] = far
+        ub[off:] = np.minimum(ub[off:], d2)
+        ub[:-off] = np.minimum(ub[:-off], d2)
+    return ub
+
+
+def nearest_foreign(tree, labels, far, best_d2, best_j, exact, window=8, batch=1024):
+    # for every point, its lightest edge (dist2, j) to another component.
+    # Components only grow, so an exact answer from an earlier round stays
+    # exact while j is still foreign; other points are searched again,
+    # skipping anything that cannot beat the best edge their component has.
+    n = len(labels)
+    valid = exact & (best_j < n)
+    valid[valid] = labels[best_j[valid]] != labels[valid]
+    best_d2[~valid] = far
+    best_j[~valid] = n
+    comp_best = np.full(n, far, dtype=tree.coords.dtype)
+    np.minimum.at(comp_best, labels[valid], best_d2[valid])
+    node_label = tree.node_labels(labels)
+    perm = tree.perm
+    ub_tree = window_bounds(tree, labels, far, window)
+    ub = np.empty_like(ub_tree)
+    ub[perm] = ub_tree
+
+    # leaves near other components go first, so their short edges tighten
+    # the component bounds before the leaves deep inside a component run
+    leaf_ub = np.minimum.reduceat(ub_tree, [tree.start[v] for v in tree.leaves])
+    for q in [tree.leaves[k] for k in np.argsort(leaf_ub, kind="stable")]:
+        qidx = perm[tree.start[q]:tree.end[q]]
+        need = ~valid[qidx]
+        if not need.any():
+            continue
+        qlab = labels[qidx]
+        qpts = tree.coords[:, qidx]
+        qbest, qj = best_d2[qidx], best_j[qidx]
+        limit = np.minimum(ub[qidx], comp_best[qlab])
+        own = node_label[q]
+        bound = np.minimum(qbest, limit)[need].max()
+
+        qlo, qhi = tree.lo[q], tree.hi[q]
+        stack = [(0, 0)]
+        pending, size = [], 0
+        while stack or pending:
+            v = None
+            if stack:
+                d, v = stack.pop()
+                if d > bound or (own != -1 and node_label[v] == own):
+                    continue
+                if tree.left[v] != -1:
+                    l, r = tree.left[v], tree.right[v]
+                    dl = box_dist2(qlo, qhi, tree.lo[l], tree.hi[l])
+                    dr = box_dist2(qlo, qhi, tree.lo[r], tree.hi[r])
+                    # nearer child on top of the stack
+                    stack.extend(((dl, l), (dr, r)) if dl > dr else ((dr, r), (dl, l)))
+                    continue
+                pending.append(perm[tree.start[v]:tree.end[v]])
+                size += tree.end[v] - tree.start[v]
+                if size < batch and stack:
+                    continue
+
+            # compare the query leaf with the gathered leaves in one go
+            ridx = np.concatenate(pending)
+            pending, size = [], 0
+            rpts = tree.coords[:, ridx]
+            d2 = ((qpts[:, :, None] - rpts[:, None, :]) ** 2).sum(axis=0)
+            d2[qlab[:, None] == labels[ridx][None, :]] = far
+            # for a fixed point q the tie break on (min, max) is just j order
+            row = d2.min(axis=1)
+            j = np.where(d2 == row[:, None], ridx[None, :], n).min(axis=1)
+            better = need & ((row < qbest) | ((row == qbest) & (j < qj)))
+            qbest = np.where(better, row, qbest)
+            qj = np.where(better, j, qj)
+            bound = np.minimum(qbest, limit)[need].max()
+
+        best_d2[qidx], best_j[qidx] = qbest, qj
+        # anything pruned was further than the point's limit
+        exact[qidx] = ~need | (qbest <= limit)
+        np.minimum.at(comp_best, qlab, qbest)
+
+
+def mst_heaviest_edge(pts, leaf_size=32):
+    n = len(pts)
+    (xs, ys, zs), far = point_arrays(pts)
+    tree = KDTree(xs, ys, zs, leaf_size)
+    dsu = DSU(n)
+    heaviest = None
+    best_d2 = np.full(n, far, dtype=tree.coords.dtype)
+    best_j = np.full(n, n, dtype=np.int64)
+    exact = np.zeros(n, dtype=bool)
+
+    while dsu.components > 1:
+        labels = np.array(dsu.parent)
+        while True:
+            up = labels[labels]
+            if (up == labels).all():
+                break
+            labels = up
+
+        nearest_foreign(tree, labels, far, best_d2, best_j, exact)
+        found = np.flatnonzero(best_j < n)
+        i, j = found, best_j[found]
+        lo, hi = np.minimum(i, j), np.maximum(i, j)
+        d2 = best_d2[found]
+        # lightest (dist2, lo, hi) per component
+        order = np.lexsort((hi, lo, d2, labels[found]))
+        comp = labels[found][order]
+        first = order[np.r_[True, comp[1:] != comp[:-1]]]
+
+        for e in first.tolist():
+            edge = (int(d2[e]), int(lo[e]), int(hi[e]))
+            if dsu.union(edge[1], edge[2]) and (heaviest is None or edge > heaviest):
+                heaviest = edge
+
+    return heaviest
+
+
+def last_connection_x_product_mst(filename, leaf_size=32):
+    pts = read_points(filename)
+    if len(pts) < 2:
+        return 0
+    _, i, j = mst_heaviest_edge(pts, leaf_size)
+    return pts[i][0] * pts[j][0]
+
+
+def last_connection_x_product_streamed(filename):
+    # same walk as above, but edges are only worked out until everything joins
+    pts = read_points(filename)
+    n = len(pts)
+    if n < 2:
+        return 0
+
+    dsu = DSU(n)
+    for _, i, j in sorted_edges(pts):
+        if dsu.union(i, j) and dsu.components == 1:
+            return pts[i][0] * pts[j][0]
+
+
+if __name__ == "__main__":
+    # example:
+    print(last_connection_x_product("day8input.txt"))  # should be 25272 for the example
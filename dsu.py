@@ -0,0 +1,90 @@
+from array import array
+
+
+class DSU:
+    """
+    Disjoint sets over 0..n-1 with union by size and path halving. parent and
+    size are flat int arrays, and a histogram of set sizes (size -> how many
+    sets have it) is kept up to date by every union, so the set sizes never
+    need a recount over all the roots.
+    """
+
+    __slots__ = ("parent", "size", "components", "histogram")
+
+    def __init__(self, n):
+        self.parent = array("i", range(n))
+        self.size = array("i", [1]) * n
+        self.components = n
+        self.histogram = {1: n} if n else {}
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def _joined(self, a, b):
+        # histogram update for sets of sizes a and b becoming one
+        hist = self.histogram
+        for s in (a, b):
+            if hist[s] == 1:
+                del hist[s]
+            else:
+                hist[s] -= 1
+        hist[a + b] = hist.get(a + b, 0) + 1
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        size = self.size
+        if size[ra] < size[rb]:
+            ra, rb = rb, ra
+        self._joined(size[ra], size[rb])
+        self.parent[rb] = ra
+        size[ra] += size[rb]
+        self.components -= 1
+        return True
+
+    def union_many(self, edges):
+        """
+        Union every (i, j) pair of edges in order, an (m, 2) array or any
+        iterable of pairs, and return the indices of the pairs that joined
+        two sets. Stops early once everything is one set, so a lazy iterable
+        is never read past that point.
+        """
+        if hasattr(edges, "tolist"):
+            edges = edges.tolist()
+        parent, size, joined = self.parent, self.size, self._joined
+        done = []
+        if self.components <= 1:
+            return done
+
+        for k, (a, b) in enumerate(edges):
+            # find, inlined
+            while parent[a] != a:
+                parent[a] = parent[parent[a]]
+                a = parent[a]
+            while parent[b] != b:
+                parent[b] = parent[parent[b]]
+                b = parent[b]
+            if a == b:
+                continue
+            if size[a] < size[b]:
+                a, b = b, a
+            joined(size[a], size[b])
+            parent[b] = a
+            size[a] += size[b]
+            done.append(k)
+            self.components -= 1
+            if self.components == 1:
+                break
+        return done
+
+    def sizes(self):
+        """All set sizes, largest first."""
+        out = []
+        for s in sorted(self.histogram, reverse=True):
+            out.extend([s] * self.histogram[s])
+        return out